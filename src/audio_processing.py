@@ -2,23 +2,85 @@
 audio_processing.py
 
 This module handles all audio-related processing.
-It provides functions for generating a voiceover using gTTS and for loading background music.
+It provides functions for generating a voiceover using gTTS, for loading background music,
+and for mapping the voiceover's non-silent regions to text segments.
 All tweakable parameters (hyperparameters) are defined in one block at the start of each function.
 """
 
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import subprocess
+import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-from moviepy.editor import AudioFileClip
+# Submodule imports instead of moviepy.editor, which loads every fx module and preview helper
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.audio.fx.volumex import volumex
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 import numpy as np
-from pydub import AudioSegment
-from pydub.silence import detect_nonsilence
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Texts longer than this (in characters) are synthesized sentence by sentence in parallel.
+SENTENCE_PARALLEL_THRESHOLD = 200
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Lines printed by ffmpeg's silencedetect filter on stderr.
+_SILENCE_START_RE = re.compile(r"silence_start: (-?[\d.e+-]+)")
+_SILENCE_END_RE = re.compile(r"silence_end: (-?[\d.e+-]+)")
+
+def _synthesize_parallel(sentences: list, lang: str, slow: bool, output_path: str) -> bool:
+    """
+    Synthesizes each sentence with its own gTTS request on a thread pool and joins the
+    parts with ffmpeg's concat demuxer (stream copy, no re-encode) into output_path.
+    Returns False if the parts could not be joined, so the caller can fall back to a
+    single request.
+    """
+    with tempfile.TemporaryDirectory(prefix="voiceover_") as work_dir:
+        part_paths = [os.path.join(work_dir, f"part_{i}.mp3") for i in range(len(sentences))]
+        with ThreadPoolExecutor(max_workers=min(4, len(sentences))) as executor:
+            futures = [
+                executor.submit(gTTS(text=sentence, lang=lang, slow=slow).save, part_path)
+                for sentence, part_path in zip(sentences, part_paths)
+            ]
+            for future in futures:
+                future.result()
+
+        list_path = os.path.join(work_dir, "parts.txt")
+        with open(list_path, "w") as f:
+            for part_path in part_paths:
+                f.write(f"file '{part_path}'\n")
+
+        try:
+            subprocess.run(
+                [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", "-f", "mp3", output_path],
+                check=True,
+                capture_output=True
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            logging.warning(f"Could not join voiceover parts with ffmpeg, synthesizing in one request: {e}")
+            return False
+    return True
 
 def generate_voiceover(text: str, lang: str = "en", output_path: str = "voiceover.mp3", slow: bool = False) -> str:
     """
     Generates a voiceover audio file from text using Google Text-to-Speech (gTTS).
+    Results are cached on disk by (text, lang, slow), so re-rendering the same fact
+    skips the network round-trip. Long multi-sentence texts are synthesized one
+    sentence per request in parallel and concatenated.
 
     Hyperparameters / Assumptions:
         DEFAULT_LANG = "en"      # Default language for TTS.
         DEFAULT_SLOW = False     # Speak at normal speed by default.
+        DEFAULT_CACHE_DIR = "./.gtts_cache"  # Overridden by the GTTS_CACHE_DIR environment variable.
+        SENTENCE_PARALLEL_THRESHOLD = 200    # Characters above which sentences are synthesized in parallel.
     
     Parameters:
         text (str): The text to convert into speech.
@@ -29,15 +91,50 @@ def generate_voiceover(text: str, lang: str = "en", output_path: str = "voiceove
     Returns:
         str: The path to the saved voiceover audio file.
     """
-    # Create a gTTS object with the provided parameters.
-    tts = gTTS(text=text, lang=lang, slow=slow)
-    # Save the generated audio to output_path.
-    tts.save(output_path)
+    cache_dir = os.environ.get("GTTS_CACHE_DIR", "./.gtts_cache")
+    key = hashlib.sha256(f"{text}|{lang}|{slow}".encode()).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"{key}.mp3")
+
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Save to a temporary file first so concurrent runs never see a partial cache entry.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".mp3.tmp")
+        os.close(fd)
+        try:
+            sentences = [s for s in _SENTENCE_SPLIT_RE.split(text.strip()) if s]
+            use_parallel = len(text) > SENTENCE_PARALLEL_THRESHOLD and len(sentences) > 1
+            if not (use_parallel and _synthesize_parallel(sentences, lang, slow, tmp_path)):
+                # Short text, or the sentence parts could not be joined: one request for the whole text.
+                # Create a gTTS object with the provided parameters.
+                tts = gTTS(text=text, lang=lang, slow=slow)
+                tts.save(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # Copy the cached audio to output_path.
+    shutil.copy(cache_path, output_path)
     return output_path
 
+@lru_cache(maxsize=8)
+def _load_music_clip(music_path: str, volume: float, mtime: float):
+    """
+    Decodes and volume-adjusts a music track once per unique (music_path, volume, mtime).
+    The modification time is part of the cache key so a track rewritten in place is reopened.
+    """
+    # Load the music file as an AudioFileClip.
+    music_clip = AudioFileClip(music_path)
+    # Adjust the volume.
+    return volumex(music_clip, volume)
+
 def load_music(music_path: str, volume: float = 0.3):
     """
     Loads a background music track from a file, applies a volume adjustment, and returns an AudioFileClip.
+    The decoded clip is memoized per (music_path, volume) and file modification time, so batch
+    runs over several facts only open each track once; every caller gets its own copy to compose with.
+    The copies share the cached clip's ffmpeg reader, so callers must not close the returned clip.
     
     Hyperparameters / Assumptions:
         DEFAULT_MUSIC_VOLUME = 0.3  # Default volume multiplier for the background music.
@@ -47,39 +144,203 @@ def load_music(music_path: str, volume: float = 0.3):
         volume (float): The volume multiplier to apply. Default is 0.3.
         
     Returns:
-        AudioFileClip: An audio clip object with adjusted volume.
+        AudioFileClip: An audio clip object with adjusted volume (shared reader; do not close).
     """
-    # Load the music file as an AudioFileClip.
-    music_clip = AudioFileClip(music_path)
-    # Adjust the volume.
-    music_clip = music_clip.volumex(volume)
-    return music_clip
+    return _load_music_clip(music_path, volume, os.path.getmtime(music_path)).copy()
+
+@lru_cache(maxsize=32)
+def _probe_duration(path: str, mtime: float) -> float:
+    """
+    Returns the duration of a media file in seconds, parsed by moviepy from ffmpeg's header
+    output (ffprobe is not needed, and may not ship with moviepy's bundled ffmpeg).
+    The modification time is part of the cache key so rewritten files are probed again.
+    """
+    return float(ffmpeg_parse_infos(path)["duration"])
+
+def _get_duration(path: str) -> float:
+    """
+    Returns the (cached) duration of a media file in seconds.
+    """
+    return _probe_duration(path, os.path.getmtime(path))
+
+def _ffmpeg_nonsilence(voiceover_path: str, min_silence_len: int = 100, silence_thresh: float = -40) -> tuple[list, float]:
+    """
+    Detects non-silent regions with ffmpeg's native silencedetect filter.
+
+    ffmpeg streams the file and scans the PCM in C, so no decoded audio is held in Python.
+
+    Parameters:
+        voiceover_path (str): Path to the audio file.
+        min_silence_len (int): Minimum silence length in milliseconds.
+        silence_thresh (float): Silence threshold in dBFS.
+
+    Returns:
+        tuple[list, float]: (ranges, total_duration), where ranges is a list of (start, end)
+                            pairs of non-silent regions in seconds and total_duration is the
+                            file's length in seconds.
+    """
+    result = subprocess.run(
+        [get_setting("FFMPEG_BINARY"), "-nostats", "-i", voiceover_path,
+         "-af", f"silencedetect=n={silence_thresh}dB:d={min_silence_len / 1000}",
+         "-f", "null", "-"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg silencedetect failed on '{voiceover_path}': {result.stderr.strip()}")
+
+    silence_starts = [max(0.0, float(value)) for value in _SILENCE_START_RE.findall(result.stderr)]
+    silence_ends = [float(value) for value in _SILENCE_END_RE.findall(result.stderr)]
+    total_duration = _get_duration(voiceover_path)
+    # A silence that runs to the end of the file may have no silence_end line.
+    silence_ends += [total_duration] * (len(silence_starts) - len(silence_ends))
+
+    # Invert the silent ranges into non-silent ones.
+    non_silent_ranges = []
+    prev_end = 0.0
+    for start, end in zip(silence_starts, silence_ends):
+        if start > prev_end:
+            non_silent_ranges.append((prev_end, start))
+        prev_end = end
+    if total_duration > prev_end:
+        non_silent_ranges.append((prev_end, total_duration))
+    return non_silent_ranges, total_duration
 
-def analyze_voiceover_timing(voiceover_path: str, text: str, min_silence_len=100):
+def _decode_pcm(path: str, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Decodes an audio file to mono 16-bit PCM by piping ffmpeg's s16le output straight into numpy.
+
+    Parameters:
+        path (str): Path to the audio file.
+        sample_rate (int): Output sample rate in Hz.
+
+    Returns:
+        np.ndarray: int16 samples viewing the decoded buffer.
+    """
+    proc = subprocess.Popen(
+        [get_setting("FFMPEG_BINARY"), "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    raw, _ = proc.communicate()
+    if proc.returncode != 0:
+        raise Exception(f"ffmpeg failed to decode '{path}'")
+    return np.frombuffer(raw, dtype=np.int16)
+
+def _detect_nonsilence(samples: np.ndarray, frame_rate: int, min_silence_len: int = 1000, silence_thresh: float = -16, seek_step: int = 1) -> list:
+    """
+    Vectorized equivalent of pydub's detect_nonsilent for mono 16-bit samples.
+
+    pydub slices the segment and calls audioop.rms once per seek_step in a Python loop.
+    Here the squared samples are prefix-summed once, so the RMS of every window is a
+    single array expression and the silence test is one comparison over the whole array.
+
+    Parameters:
+        samples (np.ndarray): Mono int16 samples.
+        frame_rate (int): Sample rate of samples in Hz.
+        min_silence_len (int): Window length in milliseconds.
+        silence_thresh (float): Silence threshold in dBFS.
+        seek_step (int): Step between window starts in milliseconds.
+
+    Returns:
+        list: [start_ms, end_ms] pairs of non-silent regions.
+    """
+    seg_len = round(1000 * len(samples) / frame_rate)
+    if seg_len < min_silence_len:
+        return [[0, seg_len]]
+
+    # Squared samples, prefix-summed for O(1) window sums. Squaring and summing write into one
+    # preallocated float buffer, so the int16 view of the decoded bytes is never copied.
+    frames = len(samples)
+    cumulative = np.empty(frames + 1, dtype=np.float64)
+    cumulative[0] = 0.0
+    np.square(samples, out=cumulative[1:], dtype=np.float64)
+    np.cumsum(cumulative[1:], out=cumulative[1:])
+
+    # Window starts in ms, including the final window pydub always checks.
+    last_start = seg_len - min_silence_len
+    starts = np.arange(0, last_start + 1, seek_step)
+    if last_start % seek_step:
+        starts = np.append(starts, last_start)
+
+    first = np.minimum((starts * frame_rate // 1000).astype(np.int64), frames)
+    last = np.minimum(((starts + min_silence_len) * frame_rate // 1000).astype(np.int64), frames)
+    counts = np.maximum(last - first, 1)
+    rms = np.sqrt((cumulative[last] - cumulative[first]) / counts)
+
+    # Compare in amplitude space; identical to rms_db <= silence_thresh without log10(0).
+    threshold = (10 ** (silence_thresh / 20)) * 32768  # full scale for 16-bit samples
+    silent_starts = starts[rms <= threshold]
+    if len(silent_starts) == 0:
+        return [[0, seg_len]]
+
+    # Group silent windows into ranges the same way pydub does.
+    gaps = np.diff(silent_starts)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+    range_starts = np.concatenate(([silent_starts[0]], silent_starts[breaks + 1]))
+    range_ends = np.concatenate((silent_starts[breaks], [silent_starts[-1]])) + min_silence_len
+
+    if range_starts[0] == 0 and range_ends[0] == seg_len:
+        return []
+
+    # Invert the silent ranges into non-silent ones.
+    nonsilent_starts = np.concatenate(([0], range_ends))
+    nonsilent_ends = np.concatenate((range_starts, [seg_len]))
+    return [[int(start), int(end)] for start, end in zip(nonsilent_starts, nonsilent_ends) if end > start]
+
+def _rms_nonsilence(voiceover_path: str, min_silence_len: int = 100, silence_thresh: float = -40, seek_step: int = 25) -> tuple[list, float]:
+    """
+    Detects non-silent regions by decoding to PCM and running the numpy RMS scan.
+    The decoded samples only live for the duration of this call; the total duration is taken
+    from their count, so no separate probe is needed.
+
+    Returns:
+        tuple[list, float]: (ranges, total_duration), where ranges is a list of (start, end)
+                            pairs of non-silent regions in seconds and total_duration is the
+                            file's length in seconds.
+    """
+    sample_rate = 16000
+    samples = _decode_pcm(voiceover_path, sample_rate)
+    non_silent_ranges = _detect_nonsilence(samples, sample_rate, min_silence_len, silence_thresh, seek_step)
+    # Convert milliseconds to seconds
+    return [(start/1000, end/1000) for start, end in non_silent_ranges], len(samples) / sample_rate
+
+def analyze_voiceover_timing(voiceover_path: str, text: str, min_silence_len=100, seek_step=25, silence_detector: str = "ffmpeg"):
     """
     Analyzes the voiceover audio to map word timings.
     
+    Hyperparameters / Assumptions:
+        SILENCE_THRESH = -40     # dB below which is considered silence.
+        DEFAULT_DETECTOR = "ffmpeg"  # ffmpeg's silencedetect filter; "rms" uses the in-process numpy scan.
+        DEFAULT_SEEK_STEP = 25   # ms between RMS windows; roughly phoneme scale.
+    
     Parameters:
         voiceover_path (str): Path to the voiceover audio file.
         text (str): The text of the voiceover.
         min_silence_len (int): Minimum silence length in milliseconds to consider as a pause.
+        seek_step (int): Step in milliseconds between RMS windows for the "rms" detector.
+                         1 checks every millisecond; 25 is ~25x fewer windows and only shifts
+                         detected boundaries by up to seek_step ms, which is well below word scale.
+        silence_detector (str): "ffmpeg" (default) or "rms".
         
     Returns:
         list: A list of segments with their start and end times.
     """
-    # Load the audio file
-    audio = AudioSegment.from_file(voiceover_path)
-    
-    # Detect non-silent chunks
+    # Detect non-silent chunks (in seconds)
     # Parameters can be adjusted based on your specific audio characteristics
-    non_silent_ranges = detect_nonsilence(
-        audio,
-        min_silence_len=min_silence_len,
-        silence_thresh=-40  # dB below which is considered silence
-    )
-    
-    # Convert milliseconds to seconds
-    non_silent_ranges = [(start/1000, end/1000) for start, end in non_silent_ranges]
+    if silence_detector == "ffmpeg":
+        non_silent_ranges, total_duration = _ffmpeg_nonsilence(
+            voiceover_path,
+            min_silence_len=min_silence_len,
+            silence_thresh=-40  # dB below which is considered silence
+        )
+    else:
+        non_silent_ranges, total_duration = _rms_nonsilence(
+            voiceover_path,
+            min_silence_len=min_silence_len,
+            silence_thresh=-40,  # dB below which is considered silence
+            seek_step=seek_step
+        )
     
     # Split the text into segments
     words = text.split()
@@ -91,7 +352,7 @@ def analyze_voiceover_timing(voiceover_path: str, text: str, min_silence_len=100
         from visual_processing import split_text_into_word_chunks
         chunks = split_text_into_word_chunks(text)
         
-        total_duration = audio.duration_seconds
+        # Only the duration is needed here; both detectors already know it
         segment_duration = total_duration / len(chunks)
         
         for i, chunk in enumerate(chunks):
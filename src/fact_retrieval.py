@@ -5,17 +5,43 @@ This module handles retrieving and processing facts from an API.
 It provides functions for retrieving facts, expanding them using AI, and extracting keywords.
 """
 
+import asyncio
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import re
 import os
 import logging
 import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Union
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Shared HTTP session so repeated API calls reuse pooled TCP/TLS connections (used by get_fact;
+# AI expansion uses its own async HTTP/2 client)
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# Keys that commonly hold the fact text in JSON API responses, in priority order
+_FACT_KEYS = ('text', 'fact', 'content', 'value', 'message')
+
+# Built once at import time and shared by every extract_keywords call
+_STOPWORDS = frozenset({'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what', 'with', 'by', 'for', 'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', 'don', 'should', 'now'})
+
+# Runs of three or more letters (Unicode-aware, no digits or underscores)
+_WORD_RE = re.compile(r'[^\W\d_]{3,}')
+
 def get_fact(api_url: str, config: Dict = None) -> str:
     """
     Retrieves a random fact from a specified API.
@@ -31,29 +57,25 @@ def get_fact(api_url: str, config: Dict = None) -> str:
     ai_expansion_enabled = config.get("ai_expansion_enabled", False) if config else False
     
     try:
-        response = requests.get(api_url)
+        response = _SESSION.get(api_url)
         response.raise_for_status()  # Raise an exception for bad status codes
         
         # Different APIs return data in different formats, so we need to handle various cases
         try:
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Try to extract the fact from the response based on common API structures
             if isinstance(data, str):
                 fact = data
             elif isinstance(data, dict):
-                # Look for common keys that might contain the fact
-                for key in ['text', 'fact', 'content', 'value', 'message']:
-                    if key in data:
-                        fact = data[key]
-                        break
-                else:
-                    # If no common key is found, just use the first value
-                    fact = list(data.values())[0]
+                # Look for common keys that might contain the fact;
+                # if no common key is found, just use the first value
+                fact = next((data[key] for key in _FACT_KEYS if key in data),
+                            next(iter(data.values()), ''))
             else:
                 fact = str(data)
                 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # If the response is not JSON, assume it's plain text
             fact = response.text
             
@@ -65,7 +87,7 @@ def get_fact(api_url: str, config: Dict = None) -> str:
                 
         return fact
         
-    except (requests.RequestException, json.JSONDecodeError) as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         logging.error(f"Error retrieving fact: {e}")
         
         # Fallback: return a hard-coded fact
@@ -78,9 +100,109 @@ def get_fact(api_url: str, config: Dict = None) -> str:
         ]
         return random.choice(fallback_facts)
 
+async def _expand_with_huggingface(client: httpx.AsyncClient, fact: str, api_key: str) -> str:
+    """
+    Asks the Hugging Face inference API to expand the fact. Returns "" if nothing usable comes back.
+    """
+    api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
+    headers = {"Authorization": f"Bearer {api_key}"}
+    
+    prompt = f"""
+    Expand this fact into a 3-sentence engaging narrative. Keep it concise and include one surprising detail: "{fact}"
+    """
+    
+    payload = {
+        "inputs": prompt,
+        "parameters": {"max_length": 512, "temperature": 0.7}
+    }
+    
+    response = await client.post(api_url, headers=headers, json=payload)
+    response.raise_for_status()
+    
+    result = orjson.loads(response.content)
+    if isinstance(result, list) and len(result) > 0:
+        # Extract the generated text
+        expanded_fact = result[0].get("generated_text", "")
+        
+        # Clean up the response to extract just the expanded fact
+        # This pattern may need to be adjusted based on the specific model's output format
+        match = re.search(r'(?:.*?)((?:.*?\.){1,3})', expanded_fact, re.DOTALL)
+        if match:
+            return match.group(1).strip()
+        return expanded_fact.strip()
+    return ""
+
+async def _expand_with_gemini(client: httpx.AsyncClient, fact: str, api_key: str) -> str:
+    """
+    Asks the Gemini API to expand the fact. Returns "" if nothing usable comes back.
+    """
+    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={api_key}"
+    
+    payload = {
+        "contents": [{
+            "parts": [{
+                "text": f"Expand this fact into a 3-sentence engaging narrative. Keep it concise and include one surprising detail: {fact}"
+            }]
+        }]
+    }
+    
+    response = await client.post(api_url, json=payload)
+    response.raise_for_status()
+    
+    result = orjson.loads(response.content)
+    expanded_text = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+    return expanded_text.strip()
+
+def _async_client() -> httpx.AsyncClient:
+    """
+    Returns an HTTP/2 client, or an HTTP/1.1 one when the optional 'h2' package is missing.
+    """
+    try:
+        return httpx.AsyncClient(http2=True, timeout=30.0)
+    except ImportError as e:
+        logging.warning(f"HTTP/2 unavailable for AI fact expansion, using HTTP/1.1: {e}")
+        return httpx.AsyncClient(timeout=30.0)
+
+async def _expand_fact_with_ai_async(fact: str, config: Dict) -> str:
+    """
+    Queries every configured AI provider (Hugging Face, Gemini) concurrently over one client and
+    returns the first non-empty answer to arrive, or "". Providers still running are cancelled.
+    """
+    providers = {}
+    huggingface_api_key = config.get("huggingface_api_key", "")
+    if huggingface_api_key and huggingface_api_key != "YOUR_KEY":
+        providers["Hugging Face"] = (_expand_with_huggingface, huggingface_api_key)
+    gemini_api_key = config.get("gemini_api_key", "")
+    if gemini_api_key and gemini_api_key != "YOUR_KEY":
+        providers["Gemini"] = (_expand_with_gemini, gemini_api_key)
+    if not providers:
+        return ""
+    
+    async with _async_client() as client:
+        pending = {
+            asyncio.create_task(expand(client, fact, api_key)): name
+            for name, (expand, api_key) in providers.items()
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is not None:
+                        logging.error(f"Error expanding fact with {name} API: {task.exception()}")
+                    elif task.result():
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    return ""
+
 def expand_fact_with_ai(fact: str, config: Dict) -> str:
     """
     Expands a fact using AI to make it more engaging and informative.
+    The configured AI providers are queried in parallel and the first answer wins;
+    if none answers, a simple rule-based expansion is used.
     
     Parameters:
         fact (str): The original fact.
@@ -89,65 +211,17 @@ def expand_fact_with_ai(fact: str, config: Dict) -> str:
     Returns:
         str: An expanded version of the fact, or the original if expansion fails.
     """
-    # Try to use Hugging Face API for AI expansion
-    huggingface_api_key = config.get("huggingface_api_key", "")
-    if huggingface_api_key and huggingface_api_key != "YOUR_KEY":
-        try:
-            api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
-            headers = {"Authorization": f"Bearer {huggingface_api_key}"}
-            
-            prompt = f"""
-            Expand this fact into a 3-sentence engaging narrative. Keep it concise and include one surprising detail: "{fact}"
-            """
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {"max_length": 512, "temperature": 0.7}
-            }
-            
-            response = requests.post(api_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                # Extract the generated text
-                expanded_fact = result[0].get("generated_text", "")
-                
-                # Clean up the response to extract just the expanded fact
-                # This pattern may need to be adjusted based on the specific model's output format
-                match = re.search(r'(?:.*?)((?:.*?\.){1,3})', expanded_fact, re.DOTALL)
-                if match:
-                    return match.group(1).strip()
-                return expanded_fact.strip()
-            
-        except Exception as e:
-            logging.error(f"Error expanding fact with Hugging Face API: {e}")
-    
-    # Fallback: Try to use the Gemini API if available
-    gemini_api_key = config.get("gemini_api_key", "")
-    if gemini_api_key and gemini_api_key != "YOUR_KEY":
-        try:
-            api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={gemini_api_key}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": f"Expand this fact into a 3-sentence engaging narrative. Keep it concise and include one surprising detail: {fact}"
-                    }]
-                }]
-            }
-            
-            response = requests.post(api_url, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            expanded_text = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-            
-            if expanded_text:
-                return expanded_text.strip()
-                
-        except Exception as e:
-            logging.error(f"Error expanding fact with Gemini API: {e}")
+    # Query the Hugging Face and Gemini APIs concurrently. asyncio.run cannot be nested in a
+    # running event loop, so a caller that already has one gets its own loop on a worker thread.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        expanded_fact = asyncio.run(_expand_fact_with_ai_async(fact, config))
+    else:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            expanded_fact = executor.submit(asyncio.run, _expand_fact_with_ai_async(fact, config)).result()
+    if expanded_fact:
+        return expanded_fact
     
     # Second fallback: Simple rule-based expansion
     try:
@@ -193,26 +267,12 @@ def extract_keywords(text: str, max_keywords: int = 5) -> List[str]:
     Returns:
         List[str]: A list of extracted keywords.
     """
-    # Convert to lowercase and remove punctuation
-    text = re.sub(r'[^\w\s]', '', text.lower())
-    
-    # Define common stopwords to filter out
-    stopwords = {'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what', 'with', 'by', 'for', 'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', 'don', 'should', 'now'}
-    
-    # Split the text into words and filter out stopwords and short words
-    words = [word for word in text.split() if word not in stopwords and len(word) > 2]
-    
-    # Count word frequencies
-    word_counts = {}
-    for word in words:
-        if word in word_counts:
-            word_counts[word] += 1
-        else:
-            word_counts[word] = 1
-    
-    # Sort words by frequency and get the top N keywords
-    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-    keywords = [word for word, _ in sorted_words[:max_keywords]]
+    # Lowercase, tokenize and drop short words in one regex pass, then filter out stopwords
+    words = [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS]
+    
+    # Count word frequencies and get the top N keywords
+    word_counts = Counter(words)
+    keywords = [word for word, _ in word_counts.most_common(max_keywords)]
     
     # If we don't have enough keywords, add some default ones
     if len(keywords) < max_keywords:
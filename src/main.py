@@ -1,6 +1,7 @@
 import os
-import json
+import orjson
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Import functions from the other modules (to be implemented separately)
 from fact_retrieval import get_fact, extract_keywords
@@ -8,12 +9,16 @@ from audio_processing import generate_voiceover, load_music
 from visual_processing import select_background, create_text_clip
 from video_assembly import assemble_video, save_video
 
+# Spaces become underscores and punctuation is dropped when deriving the output file name.
+_VIDEO_NAME_TABLE = str.maketrans({" ": "_", "?": None, "!": None, ".": None, ",": None,
+                                   ":": None, ";": None, "(": None, ")": None})
+
 def load_config(config_path: str) -> dict:
     """
     Loads the configuration from a JSON file.
     """
-    with open(config_path, 'r') as f:
-        config = json.load(f)
+    with open(config_path, 'rb') as f:
+        config = orjson.loads(f.read())
     return config
 
 def main():
@@ -36,46 +41,54 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
 
     # === Stage 1: Fact Retrieval and Processing ===
-    # Retrieve a fact using the API URL specified in the config (a string)
-    fact_text: str = get_fact(config['api_url'])
-    # Extract key thematic words from the fact for visual matching (returns a list of strings)
-    keywords: list = extract_keywords(fact_text)
-
-    # === Stage 2: Audio Generation and Music Loading ===
-    # Generate voiceover audio from the fact text.
-    # The function returns a file path (string) where the audio is saved.
-    voiceover_path: str = generate_voiceover(
-        text=fact_text,
-        lang=config.get("audio_language", "en"),
-        output_path=os.path.join(output_dir, "voiceover.mp3")
-    )
-    # Load the background music file and set its volume.
-    # This function should return either an audio file path or an audio clip object.
-    music_file = load_music(
-        music_path=config["background_music"],
-        volume=config.get("music_volume", 0.3)
-    )
+    # Retrieve a fact using the API URL specified in the config (a string);
+    # the config also carries the AI expansion settings and keys
+    fact_text: str = get_fact(config['api_url'], config)
 
-    # === Stage 3: Visual Content and Thematic Matching ===
-    # Select a background video clip that matches the theme, based on extracted keywords.
-    # The function returns a file path to the selected background clip.
-    background_clip_path: str = select_background(keywords, config)
-    # Create a text overlay clip (e.g., using MoviePy's TextClip) that displays a header and the fact.
-    # The function returns a video clip object.
-    text_clip = create_text_clip(
-        text="Did You Know?\n" + fact_text,
-        config=config
-    )
-    video_name = fact_text[:20].replace(' ', '_')
-    video_name = video_name.replace('?', '')
-    video_name = video_name.replace('!', '')
-    video_name = video_name.replace('.', '')
-    video_name = video_name.replace(',', '')
-    video_name = video_name.replace(':', '')
-    video_name = video_name.replace(';', '')
-    video_name = video_name.replace('(', '')
-    video_name = video_name.replace(')', '')
-    
+    # === Stages 2-3 run concurrently ===
+    # Voiceover generation (network), music loading (disk), background selection (network)
+    # and text rendering (Pillow) are independent of each other, so they are
+    # overlapped on a thread pool and only awaited before assembly.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # === Stage 2: Audio Generation and Music Loading ===
+        # The voiceover is on the critical path and only needs the fact text, so it is
+        # started before keyword extraction; everything else runs during the TTS wait.
+        # The function returns a file path (string) where the audio is saved.
+        voiceover_future = executor.submit(
+            generate_voiceover,
+            text=fact_text,
+            lang=config.get("audio_language", "en"),
+            output_path=os.path.join(output_dir, "voiceover.mp3")
+        )
+        # Extract key thematic words from the fact for visual matching (returns a list of strings)
+        keywords: list = extract_keywords(fact_text)
+
+        # Load the background music file and set its volume.
+        # This function should return either an audio file path or an audio clip object.
+        music_future = executor.submit(
+            load_music,
+            music_path=config["background_music"],
+            volume=config.get("music_volume", 0.3)
+        )
+
+        # === Stage 3: Visual Content and Thematic Matching ===
+        # Select a background video clip that matches the theme, based on extracted keywords.
+        # The function returns a file path to the selected background clip.
+        background_future = executor.submit(select_background, keywords, config)
+        # Create a text overlay clip (a Pillow-rendered caption) that displays a header and the fact.
+        # The function returns a video clip object.
+        text_future = executor.submit(
+            create_text_clip,
+            text="Did You Know?\n" + fact_text,
+            config=config
+        )
+
+        voiceover_path: str = voiceover_future.result()
+        music_file = music_future.result()
+        background_clip_path: str = background_future.result()
+        text_clip = text_future.result()
+
+    video_name = fact_text[:20].translate(_VIDEO_NAME_TABLE)
 
     # === Stage 4: Video Assembly ===
     # Combine the background clip, text overlay, voiceover, and background music.
@@ -96,7 +109,8 @@ def main():
     save_video(
         video_clip=final_video_clip,
         output_path=output_filename,
-        fps=config.get("fps", 32)
+        fps=config.get("fps", 32),
+        hw=config.get("hardware_encoding", "auto")
     )
 
     print("Video successfully generated and saved to:", output_filename)
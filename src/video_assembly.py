@@ -3,93 +3,249 @@ import shutil
 import tempfile
 import random
 import requests
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip, CompositeVideoClip,ColorClip , concatenate_videoclips , concatenate_audioclips
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+# Import moviepy submodules directly; moviepy.editor loads every fx module, preview helpers and
+# optional integrations at import time. Its monkeypatched clip methods (crop, resize, volumex)
+# are therefore not available here and the fx functions are called explicitly.
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.audio.AudioClip import AudioClip, CompositeAudioClip
+from moviepy.video.VideoClip import ColorClip, ImageClip
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.compositing.concatenate import concatenate_videoclips
+from moviepy.video.fx.crop import crop
+from moviepy.video.fx.resize import resize
+from moviepy.audio.fx.volumex import volumex
+from moviepy.video.fx.loop import loop
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.config import get_setting
+import subprocess
+import numpy as np
 import logging
 import time
+import threading
+from collections import deque
+from queue import Queue, Empty, Full
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Shared HTTP session so API searches and media downloads reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+def _ram_temp_root(min_free_bytes: int = 1 << 30) -> str:
+    """
+    Returns /dev/shm (tmpfs) if it exists, is writable and has at least min_free_bytes free,
+    so downloaded and fitted clips stay in RAM; otherwise None (the system temp directory).
+    Checked each time a directory is created, and only used for directories that are removed
+    after use, since files left on tmpfs hold RAM until reboot.
+    """
+    try:
+        if os.access("/dev/shm", os.W_OK) and shutil.disk_usage("/dev/shm").free >= min_free_bytes:
+            return "/dev/shm"
+    except OSError:
+        pass
+    return None
+
+# Pexels file variants to use, best first
+_PEXELS_QUALITY_PREFERENCE = ("hd", "sd", "uhd")
+# Pixabay renditions to use, best first; "large" is skipped since short segments never need it
+_PIXABAY_SIZE_PREFERENCE = ("medium", "small", "tiny")
+
+# Timestamps of recent search API calls, shared by all download threads
+_API_CALL_TIMES = deque()
+_API_RATE_LOCK = threading.Lock()
+
 # ---------------------------
 # BACKGROUND CLIP FUNCTIONS
 # ---------------------------
 
-def download_background_clip(keywords: list, config: dict, temp_dir: str = None, index: int = 0) -> str:
+def _wait_for_api_slot(max_calls: int = 100, period: float = 60.0) -> None:
     """
-    Downloads a background video clip from the internet that matches the given keywords.
+    Blocks until another search API call fits into the rate limit, using a sliding window
+    of the last `period` seconds. Safe to call from several download threads at once.
+    
+    Hyperparameters / Assumptions:
+      MAX_CALLS = 100   # The video APIs allow ~100 calls per minute.
+      PERIOD = 60.0     # Window length in seconds.
+    """
+    while True:
+        with _API_RATE_LOCK:
+            now = time.monotonic()
+            while _API_CALL_TIMES and now - _API_CALL_TIMES[0] >= period:
+                _API_CALL_TIMES.popleft()
+            if len(_API_CALL_TIMES) < max_calls:
+                _API_CALL_TIMES.append(now)
+                return
+            wait = period - (now - _API_CALL_TIMES[0])
+        time.sleep(wait)
+
+@lru_cache(maxsize=64)
+def _search_videos(source: str, api_key: str = None) -> dict:
+    """
+    Runs one search API query and returns the parsed JSON response. Responses are cached per
+    (source URL, key), so segments that share keywords (every chunk of a sentence does) cost
+    one API call instead of one each. Failed requests raise and are not cached.
     
     Parameters:
-      keywords (list): List of thematic keywords for the search query.
-      config (dict): Configuration dictionary.
-      temp_dir (str): Directory to save the downloaded video (creates a new one if None).
-      index (int): Index number for the temp file name.
+      source (str): Search API URL including the query string.
+      api_key (str): Value for the Authorization header, or None if the key is in the URL.
       
     Returns:
-      str: File path to the downloaded video clip.
+      dict: The decoded JSON response. Callers must treat it as read-only.
+    """
+    headers = {"Authorization": api_key} if api_key is not None else None
+    _wait_for_api_slot()
+    response = _SESSION.get(source, headers=headers)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def _video_sources(keywords: list, config: dict) -> list:
+    """
+    Returns the ordered list of video sources (search API endpoints or direct file URLs)
+    to try for the given keywords.
     """
     # Create a query string from keywords, or use a default
     query = "+".join(keywords[:3]) if keywords else "nature"
     
     # List of video sources to try - can be expanded with more sources
-    video_sources = config.get("video_sources", [
+    return config.get("video_sources", [
         f"https://pixabay.com/api/videos/?key={config.get('pixabay_api_key', '')}&q={query}&per_page=3",
         f"https://api.pexels.com/videos/search?query={query}&per_page=3",
         "https://sample-videos.com/video123/mp4/720/big_buck_bunny_720p_1mb.mp4"  # Fallback
     ])
+
+def _candidate_urls(source: str, config: dict) -> list:
+    """
+    Turns one video source into downloadable video URLs, best variant first, querying the
+    search API if needed. Returns an empty list if the source has no videos or is of an
+    unknown type.
+    """
+    # If source is a direct file URL (like the fallback)
+    if source.endswith('.mp4'):
+        return [source]
+    # If source is an API endpoint
+    if 'pixabay.com/api' in source:
+        data = _search_videos(source)
+        if data.get('hits') and len(data['hits']) > 0:
+            random_index = random.randint(0, min(2, len(data['hits'])-1))
+            videos = data['hits'][random_index]['videos']
+            return [videos[size]['url'] for size in _PIXABAY_SIZE_PREFERENCE if videos.get(size, {}).get('url')]
+        return []  # Try next source if no videos found
+    if 'pexels.com/videos' in source:
+        data = _search_videos(source, config.get('pexels_api_key', ''))
+        if data.get('videos') and len(data['videos']) > 0:
+            random_index = random.randint(0, min(2, len(data['videos'])-1))
+            video_files = data['videos'][random_index]['video_files']
+            # Keep the first mp4 variant of each quality, as the original linear scan did
+            files_by_quality = {}
+            for f in video_files:
+                if f.get('file_type') == 'video/mp4':
+                    files_by_quality.setdefault(f.get('quality'), f)
+            return ([files_by_quality[quality]['link'] for quality in _PEXELS_QUALITY_PREFERENCE
+                     if quality in files_by_quality] or [video_files[0]['link']])
+        return []  # Try next source if no videos found
+    return []  # Skip unknown source types
+
+def _fits_size_limit(video_url: str, max_bytes: int) -> bool:
+    """
+    Checks a video's Content-Length with a HEAD request. Unknown sizes (no header, HEAD not
+    supported, request error) are accepted so the download itself decides.
+    """
+    try:
+        head = _SESSION.head(video_url, allow_redirects=True, timeout=5)
+        size = int(head.headers.get('content-length', '0')) if head.ok else 0
+    except (requests.RequestException, ValueError):
+        return True
+    if size > max_bytes:
+        logging.info(f"Skipping {video_url}: {size} bytes exceeds the {max_bytes} byte limit")
+        return False
+    return True
+
+def _resolve_source(source: str, config: dict) -> str:
+    """
+    Returns the best video URL from one source whose size is within max_background_bytes,
+    or None if the source has no usable video.
+    """
+    max_bytes = config.get("max_background_bytes", 20_000_000)
+    for video_url in _candidate_urls(source, config):
+        if _fits_size_limit(video_url, max_bytes):
+            return video_url
+    return None
+
+def _resolve_video_url(keywords: list, config: dict) -> str:
+    """
+    Resolves the first video source that yields a video URL for the keywords, without
+    downloading anything.
     
+    Parameters:
+      keywords (list): List of thematic keywords for the search query.
+      config (dict): Configuration dictionary.
+      
+    Returns:
+      str: URL of the video file to download.
+    """
+    for source in _video_sources(keywords, config):
+        try:
+            video_url = _resolve_source(source, config)
+            if video_url:
+                return video_url
+        except Exception as e:
+            logging.warning(f"Failed to search videos on {source}: {e}")
+    raise Exception("Failed to resolve a video URL from all available sources")
+
+def _stream_to_disk(video_url: str, path: str) -> str:
+    """
+    Streams a video file to disk and returns the path.
+    """
+    logging.info(f"Downloading video from: {video_url}")
+    video_response = _SESSION.get(video_url, stream=True)
+    video_response.raise_for_status()
+    # Copy the raw stream in 1 MiB blocks instead of a Python callback per 8 KiB chunk
+    video_response.raw.decode_content = True
+    with open(path, "wb") as f:
+        shutil.copyfileobj(video_response.raw, f, length=1 << 20)
+    logging.info(f"Successfully downloaded video to {path}")
+    return path
+
+def download_background_clip(keywords: list, config: dict, temp_dir: str = None, index: int = 0) -> str:
+    """
+    Downloads a background video clip from the internet that matches the given keywords.
+    
+    Parameters:
+      keywords (list): List of thematic keywords for the search query.
+      config (dict): Configuration dictionary.
+      temp_dir (str): Directory to save the downloaded video (creates a new one if None).
+      index (int): Index number for the temp file name.
+      
+    Returns:
+      str: File path to the downloaded video clip.
+    """
     # Create temporary directory if not provided
     if temp_dir is None:
+        # Nothing removes this directory, so keep it on disk rather than in tmpfs
         temp_dir = tempfile.mkdtemp(prefix="background_")
     
     temp_video_path = os.path.join(temp_dir, f"background_{index}.mp4")
     
     # Try each video source until successful
-    for source in video_sources:
+    for source in _video_sources(keywords, config):
         try:
-            # If source is a direct file URL (like the fallback)
-            if source.endswith('.mp4'):
-                video_url = source
-            # If source is an API endpoint
-            elif 'pixabay.com/api' in source:
-                response = requests.get(source)
-                response.raise_for_status()
-                data = response.json()
-                if data.get('hits') and len(data['hits']) > 0:
-                    random_index = random.randint(0, min(2, len(data['hits'])-1))
-                    video_url = data['hits'][random_index]['videos']['medium']['url']
-                else:
-                    continue  # Try next source if no videos found
-            elif 'pexels.com/videos' in source:
-                headers = {"Authorization": config.get('pexels_api_key', '')}
-                response = requests.get(source, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                if data.get('videos') and len(data['videos']) > 0:
-                    random_index = random.randint(0, min(2, len(data['videos'])-1))
-                    for video_file in data['videos'][random_index]['video_files']:
-                        if video_file['quality'] == 'hd' and video_file['file_type'] == 'video/mp4':
-                            video_url = video_file['link']
-                            break
-                    else:
-                        video_url = data['videos'][random_index]['video_files'][0]['link']
-                else:
-                    continue  # Try next source if no videos found
-            else:
-                continue  # Skip unknown source types
-            
-            # Download the video file
-            logging.info(f"Downloading video from: {video_url}")
-            video_response = requests.get(video_url, stream=True)
-            video_response.raise_for_status()
-            with open(temp_video_path, "wb") as f:
-                for chunk in video_response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            # If we've successfully downloaded a video, break the loop
-            logging.info(f"Successfully downloaded video to {temp_video_path}")
-            return temp_video_path
-            
+            video_url = _resolve_source(source, config)
+            if not video_url:
+                continue  # Try next source
+            return _stream_to_disk(video_url, temp_video_path)
         except Exception as e:
             logging.warning(f"Failed to download video from {source}: {e}")
             continue  # Try next source
@@ -97,11 +253,66 @@ def download_background_clip(keywords: list, config: dict, temp_dir: str = None,
     # If all sources failed, raise an exception
     raise Exception("Failed to download any video from all available sources")
 
+def _download_resolved(url_future, keywords: list, config: dict, temp_dir: str, index: int) -> str:
+    """
+    Streams the video URL resolved by url_future into temp_dir. If resolving or streaming
+    fails, falls back to download_background_clip, which tries every source in turn.
+    """
+    try:
+        return _stream_to_disk(url_future.result(), os.path.join(temp_dir, f"background_{index}.mp4"))
+    except Exception as e:
+        logging.warning(f"Prefetched download for segment {index+1} failed, retrying all sources: {e}")
+        return download_background_clip(keywords, config, temp_dir, index)
+
 # This is a partial update to video_assembly.py focusing on the key changes
 
+def _ffmpeg_fit_clip(clip_path: str, start_time: float, duration: float, source_size: tuple,
+                     resolution: tuple, crop_background: bool) -> str:
+    """
+    Trims, crops and scales a clip in a single ffmpeg pass and writes the result next to the
+    source, so decoding, cropping and scaling all happen inside one filter graph and only
+    target-resolution frames are ever handed to moviepy.
+    
+    Parameters:
+      clip_path (str): Path to the source video file.
+      start_time (float): Start of the segment to keep, in seconds.
+      duration (float): Length of the segment to keep, in seconds.
+      source_size (tuple): Source (width, height).
+      resolution (tuple): Target (width, height).
+      crop_background (bool): Center-crop to the target aspect ratio (True) or stretch (False).
+      
+    Returns:
+      str: Path to the fitted intermediate video (no audio).
+    """
+    width, height = resolution
+    filters = []
+    if crop_background:
+        # Center crop to the target aspect ratio, then scale the cropped region only
+        source_w, source_h = source_size
+        crop_w = min(source_w, int(round(source_h * width / height)))
+        crop_h = min(source_h, int(round(source_w * height / width)))
+        filters.append(f"crop={crop_w}:{crop_h}:{(source_w - crop_w) // 2}:{(source_h - crop_h) // 2}")
+    filters.append(f"scale={width}:{height},setsar=1")
+    
+    fitted_path = os.path.splitext(clip_path)[0] + "_fit.mp4"
+    command = [
+        get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+        "-ss", f"{start_time:.3f}", "-t", f"{duration:.3f}", "-i", clip_path,
+        "-vf", ",".join(filters), "-an",
+        "-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-pix_fmt", "yuv420p",
+        fitted_path
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg failed to fit clip: {result.stderr.decode(errors='replace').strip()}")
+    return fitted_path
+
 def preprocess_video_clip(clip_path: str, duration: float, resolution: tuple, crop_background: bool = True) -> VideoFileClip:
     """
     Prepares a video clip by trimming to desired duration and resizing.
+    The trim, crop and scale normally run in one ffmpeg pass (_ffmpeg_fit_clip). If that
+    fails, scaling happens inside moviepy's ffmpeg decoder (target_resolution) and only
+    the aspect-ratio crop is left for moviepy.
     
     Parameters:
       clip_path (str): Path to the video file.
@@ -113,7 +324,44 @@ def preprocess_video_clip(clip_path: str, duration: float, resolution: tuple, cr
       VideoFileClip: Processed video clip.
     """
     try:
-        clip = VideoFileClip(clip_path)
+        infos = ffmpeg_parse_infos(clip_path)
+        source_w, source_h = infos['video_size']
+        
+        # Fast path: one ffmpeg pass writes a trimmed clip at exactly the target resolution,
+        # or no pass at all when the source already has that resolution
+        try:
+            # Take a random segment to get some variety
+            max_start = max(0, infos['duration'] - duration - 1)
+            start_time = random.uniform(0, max_start) if max_start > 0 else 0
+            if (source_w, source_h) == tuple(resolution):
+                # Already at the target size: trim lazily instead of re-encoding an intermediate
+                clip = VideoFileClip(clip_path, audio=False)
+                clip = clip.subclip(start_time, min(start_time + duration, clip.duration))
+            else:
+                fitted_path = _ffmpeg_fit_clip(clip_path, start_time, duration, (source_w, source_h),
+                                               resolution, crop_background)
+                clip = VideoFileClip(fitted_path, audio=False)
+            # The fitted clip can run a few frames long or short; return exactly `duration`
+            # so chained segments stay in sync with the voiceover
+            if clip.duration < duration:
+                clip = loop(clip, duration=duration)
+            elif clip.duration > duration:
+                clip = clip.subclip(0, duration)
+            return clip
+        except Exception as e:
+            logging.warning(f"Single-pass ffmpeg fit failed for '{clip_path}', falling back to moviepy: {e}")
+        
+        # Let ffmpeg scale while decoding, so frames never reach Python at source resolution
+        if crop_background:
+            # Match the covering dimension and keep the aspect ratio; the overflow is cropped below
+            if source_w / source_h > resolution[0] / resolution[1]:
+                target_resolution = (resolution[1], None)
+            else:
+                target_resolution = (None, resolution[0])
+        else:
+            # moviepy expects (height, width)
+            target_resolution = (resolution[1], resolution[0])
+        clip = VideoFileClip(clip_path, target_resolution=target_resolution)
         
         # Trim if needed
         if clip.duration > duration:
@@ -122,15 +370,12 @@ def preprocess_video_clip(clip_path: str, duration: float, resolution: tuple, cr
             start_time = random.uniform(0, max_start) if max_start > 0 else 0
             clip = clip.subclip(start_time, start_time + duration)
         
-        # Loop the clip if it's shorter than needed
+        # Loop the clip if it's shorter than needed (maps t -> t % clip.duration, no concatenation)
         if clip.duration < duration:
-            # Create a list of clip copies and concatenate them
-            num_loops = int(duration / clip.duration) + 1
-            clip_list = [clip] * num_loops
-            clip = concatenate_videoclips(clip_list)
-            clip = clip.subclip(0, duration)
+            clip = loop(clip, duration=duration)
         
-        # Resize to target resolution - with cropping instead of stretching
+        # Crop to the target aspect ratio - with cropping instead of stretching;
+        # the clip is already scaled, so this works on the decoded dimensions
         if crop_background:
             # Calculate the aspect ratio of the clip and the target
             clip_ratio = clip.w / clip.h
@@ -143,26 +388,42 @@ def preprocess_video_clip(clip_path: str, duration: float, resolution: tuple, cr
                 x_center = clip.w // 2
                 crop_x1 = max(0, x_center - new_width // 2)
                 crop_x2 = min(clip.w, x_center + new_width // 2)
-                clip = clip.crop(x1=crop_x1, x2=crop_x2)
-            else:
+                clip = crop(clip, x1=crop_x1, x2=crop_x2)
+            elif clip_ratio < target_ratio:
                 # Clip is taller than target, crop the height
                 new_height = int(clip.w / target_ratio)
                 y_center = clip.h // 2
                 crop_y1 = max(0, y_center - new_height // 2)
                 crop_y2 = min(clip.h, y_center + new_height // 2)
-                clip = clip.crop(y1=crop_y1, y2=crop_y2)
-            
-            # Resize to exact dimensions
-            clip = clip.resize(newsize=resolution)
-        else:
-            # Traditional stretch resize
-            clip = clip.resize(newsize=resolution)
+                clip = crop(clip, y1=crop_y1, y2=crop_y2)
+        
+        # Only resize if rounding left the clip a few pixels off the exact dimensions
+        if tuple(clip.size) != tuple(resolution):
+            clip = resize(clip, newsize=resolution)
         
         return clip
     
     except Exception as e:
         raise Exception(f"Error processing video clip at '{clip_path}': {e}")
 
+def _loop_audio(clip, duration: float) -> AudioClip:
+    """
+    Loops an audio clip to the given duration by mapping request times modulo the clip
+    length, so a single reader is reused instead of concatenating copies of the clip.
+    """
+    def make_frame(t):
+        t = np.asarray(t) % clip.duration
+        if t.ndim == 0:
+            return clip.get_frame(t)
+        # A chunk of times that crosses a loop point would cover both ends of the file at
+        # once, more than the reader buffers, so each side of the wrap is fetched separately
+        wraps = np.flatnonzero(np.diff(t) < 0) + 1
+        if not len(wraps):
+            return clip.get_frame(t)
+        return np.concatenate([clip.get_frame(part) for part in np.split(t, wraps)])
+    
+    return AudioClip(make_frame, duration=duration, fps=clip.fps)
+
 def assemble_video(background_clip_path: str, text_clip, voiceover_path: str, music_file: str, config: dict):
     """
     Assembles a final video using a single background clip, overlay text, voiceover, and background music.
@@ -197,8 +458,7 @@ def assemble_video(background_clip_path: str, text_clip, voiceover_path: str, mu
         music_audio = music_file  # Use the already loaded and adjusted clip
         # Loop music if needed
         if music_audio.duration < video_duration:
-            num_loops = int(video_duration / music_audio.duration) + 1
-            music_audio = concatenate_audioclips([music_audio] * num_loops).subclip(0, video_duration)
+            music_audio = _loop_audio(music_audio, video_duration)
         else:
             music_audio = music_audio.subclip(0, video_duration)
     except Exception as e:
@@ -209,16 +469,49 @@ def assemble_video(background_clip_path: str, text_clip, voiceover_path: str, mu
     final_clip.duration = video_duration
     return final_clip
 
+def _decode_backgrounds(sentence_data: list, download_futures: list, resolution: tuple,
+                        crop_background: bool, decode_queue: Queue, stop: threading.Event) -> None:
+    """
+    Decode stage of the multi-background pipeline: waits for each download in sentence order,
+    preprocesses the clip and puts (index, clip, error) on decode_queue. Exactly one item is
+    queued per segment; clip is None and error is set when the download or preprocessing failed.
+    Returns early once stop is set, closing any clip it could not hand over, so it never
+    blocks on a full queue that is no longer being read.
+    """
+    for i, (segment, download_future) in enumerate(zip(sentence_data, download_futures)):
+        if stop.is_set():
+            return
+        try:
+            clip_path = download_future.result()
+            item = (i, preprocess_video_clip(clip_path, segment['duration'], resolution, crop_background), None)
+        except Exception as e:
+            item = (i, None, e)
+        
+        while True:
+            if stop.is_set():
+                if item[1] is not None:
+                    item[1].close()
+                return
+            try:
+                decode_queue.put(item, timeout=0.1)
+                break
+            except Full:
+                continue
+
 def assemble_multi_background_video(sentence_data: list, voiceover_path: str, music_file: str, config: dict):
     """
     Assembles a video by dynamically fetching background clips for each sentence and overlaying
     corresponding text clips. The voiceover and background music are applied over the full video.
+    Background downloads run concurrently on a thread pool of `download_workers` threads, a decode
+    thread preprocesses the downloaded clips in order, and this thread builds the text overlays.
     
     Parameters:
-      sentence_data (list): List of dictionaries with keys:
+      sentence_data (list): List (or iterable, e.g. prepare_sentence_data output) of dictionaries with keys:
                             - 'text': text of the sentence
                             - 'keywords': keywords for this sentence
                             - 'duration': duration of this sentence in seconds
+                            - 'highlights' (optional): (start, end) spans of words to highlight;
+                                                       picked per segment if missing and highlighting is enabled
       voiceover_path (str): Path to the full voiceover audio file.
       music_file (str): Path to the background music file.
       config (dict): Configuration dictionary.
@@ -226,87 +519,126 @@ def assemble_multi_background_video(sentence_data: list, voiceover_path: str, mu
     Returns:
       CompositeVideoClip: The final composite video clip.
     """
+    # Segments are walked several times below, so materialize generator input once
+    sentence_data = list(sentence_data)
     resolution = tuple(config.get("resolution", (1080, 1920)))
     background_segments = []
     segment_text_clips = []
     crop_background = config.get("crop_background", True)
     
     # Create a temporary directory for all downloaded clips
-    temp_dir = tempfile.mkdtemp(prefix="multi_background_")
+    # Removed in the finally block below, so it can live in RAM
+    temp_dir = tempfile.mkdtemp(prefix="multi_background_", dir=_ram_temp_root())
     logging.info(f"Created temporary directory: {temp_dir}")
     
     try:
         current_start = 0
         
-        # Process each sentence segment
-        for i, segment in enumerate(sentence_data):
-            keywords = segment['keywords']
-            duration = segment['duration']
-            text = segment['text']
-            
-            # Dynamically download a background clip for this sentence
-            try:
-                clip_path = download_background_clip(keywords, config, temp_dir, i)
-                clip = preprocess_video_clip(clip_path, duration, resolution, crop_background)
-                background_segments.append(clip)
-            except Exception as e:
-                logging.error(f"Error fetching background for sentence {i+1}: {e}")
-                # Fallback: use a solid color clip
-                clip = ColorClip(resolution, color=(40, 40, 40), duration=duration)
-                background_segments.append(clip)
+        # Start every background download up front; only the network I/O runs on the pool,
+        # the search API quota is enforced per call by _wait_for_api_slot.
+        # Phase 1 resolves all video URLs (small JSON searches), phase 2 streams the files.
+        # URL lookups are queued first, so no stream task waits on a lookup that cannot start.
+        with ThreadPoolExecutor(max_workers=config.get("download_workers", 4)) as executor:
+            url_futures = [
+                executor.submit(_resolve_video_url, segment['keywords'], config)
+                for segment in sentence_data
+            ]
+            download_futures = [
+                executor.submit(_download_resolved, url_future, segment['keywords'], config, temp_dir, i)
+                for i, (segment, url_future) in enumerate(zip(sentence_data, url_futures))
+            ]
             
-            # Create a text clip for this sentence
-            from moviepy.editor import TextClip
-            # Apply highlights to random words if enabled
-            if config.get("highlight_enabled", True):
-                from visual_processing import highlight_key_words
-                text = highlight_key_words(text, config.get("text_highlight_color", "#FFD700"))
-            
-            text_clip = TextClip(
-                txt=text,
-                fontsize=config.get("font_size", 90),
-                font=config.get("font", "Impact"),
-                color=config.get("text_color", "white"),
-                stroke_color=config.get("text_outline_color", "black"),
-                stroke_width=config.get("text_outline_width", 5),
-                method="caption",
-                size=(resolution[0] * 0.8, resolution[1] * 0.8)
+            # A decode worker preprocesses clips as their downloads land, a few segments ahead
+            # of this thread; the bounded queue keeps at most 4 decoded clips waiting
+            decode_queue = Queue(maxsize=4)
+            stop_decoding = threading.Event()
+            decoder = threading.Thread(
+                target=_decode_backgrounds,
+                args=(sentence_data, download_futures, resolution, crop_background, decode_queue, stop_decoding),
+                daemon=True
             )
-            
-            # Position text at bottom third of the screen
-            bottom_third_position = ("center", resolution[1] * 0.7)
-            
-            # Position and time the text clip
-            text_clip = text_clip.set_position(bottom_third_position).set_start(current_start).set_duration(duration)
-            segment_text_clips.append(text_clip)
-            
-            current_start += duration
-            time.sleep(0.8) # small delay to avoid rate limiting, i get 100 calls per minute
-        
-        # Concatenate background clips
-        full_background = concatenate_videoclips(background_segments, method="compose")
+            decoder.start()
+            try:
+                # Text styling and geometry are the same for every segment
+                from visual_processing import render_caption, segment_highlights
+                highlight_enabled = config.get("highlight_enabled", True)
+                caption_style = {
+                    "font": config.get("font", "Impact"),
+                    "font_size": config.get("font_size", 90),
+                    "color": config.get("text_color", "white"),
+                    "stroke_color": config.get("text_outline_color", "black"),
+                    "stroke_width": config.get("text_outline_width", 5),
+                    "size": (int(resolution[0] * 0.8), int(resolution[1] * 0.8)),
+                    "highlight_color": config.get("text_highlight_color", "#FFD700"),
+                }
+                # Position text at bottom third of the screen
+                bottom_third_position = ("center", int(resolution[1] * 0.7))
+                
+                # Compose each sentence segment in order
+                for i, segment in enumerate(sentence_data):
+                    duration = segment['duration']
+                    text = segment['text']
+                
+                    # Wait for this sentence's preprocessed background clip
+                    _, clip, error = decode_queue.get()
+                    if error is not None:
+                        logging.error(f"Error fetching background for sentence {i+1}: {error}")
+                        # Fallback: use a solid color clip
+                        clip = ColorClip(resolution, color=(40, 40, 40), duration=duration)
+                    background_segments.append(clip)
+                
+                    # Create a text clip for this sentence, rendered with Pillow (no ImageMagick call)
+                    # Highlighted words are usually chosen by prepare_sentence_data; they are drawn in place
+                    highlights = segment_highlights(segment, highlight_enabled)
+                    text_clip = ImageClip(render_caption(text, highlights=highlights, **caption_style), transparent=True)
+                
+                    # Position and time the text clip
+                    text_clip = text_clip.set_position(bottom_third_position).set_start(current_start).set_duration(duration)
+                    segment_text_clips.append(text_clip)
+                
+                    current_start += duration
+            finally:
+                # Stop the decode worker (it may still be ahead of a failed compose loop), skip
+                # downloads that have not started, then close clips that were never taken, so
+                # nothing is still reading from temp_dir when it is removed
+                stop_decoding.set()
+                for future in url_futures + download_futures:
+                    future.cancel()
+                decoder.join()
+                while True:
+                    try:
+                        _, clip, _ = decode_queue.get_nowait()
+                    except Empty:
+                        break
+                    if clip is not None:
+                        clip.close()
         
-        # Combine all text clips into one composite
-        composite_text = CompositeVideoClip(segment_text_clips, size=resolution)
+        # Concatenate background clips. Every segment is already at the target resolution, so
+        # "chain" can forward frames directly instead of compositing onto a canvas; any stray
+        # size is resized so chained frames always match
+        background_segments = [
+            clip if tuple(clip.size) == resolution else resize(clip, newsize=resolution)
+            for clip in background_segments
+        ]
+        full_background = concatenate_videoclips(background_segments, method="chain")
         
         # Load audio components
         voiceover_audio = AudioFileClip(voiceover_path)
         music_volume = config.get("music_volume", 0.3)
-        music_audio = AudioFileClip(music_file).volumex(music_volume)
+        music_audio = volumex(AudioFileClip(music_file), music_volume)
         
         # Loop music if needed
         total_duration = sum(segment['duration'] for segment in sentence_data)
         if music_audio.duration < total_duration:
-            num_loops = int(total_duration / music_audio.duration) + 1
-            music_segments = [music_audio] * num_loops
-            music_audio = concatenate_audioclips(music_segments).subclip(0, total_duration)
+            music_audio = _loop_audio(music_audio, total_duration)
         else:
             music_audio = music_audio.subclip(0, total_duration)
         
         combined_audio = CompositeAudioClip([music_audio, voiceover_audio.set_start(0)])
         
-        # Compose final video with spliced background and text overlay
-        final_clip = CompositeVideoClip([full_background, composite_text]).set_audio(combined_audio)
+        # Compose final video with spliced background and time-gated text overlays in a single
+        # compositor, so each frame only blits the active caption onto the background
+        final_clip = CompositeVideoClip([full_background] + segment_text_clips, size=resolution).set_audio(combined_audio)
         final_clip.duration = total_duration
         
         return final_clip
@@ -323,13 +655,52 @@ def assemble_multi_background_video(sentence_data: list, voiceover_path: str, mu
 
 
 
-def save_video(video_clip, output_path: str, fps: int = 24):
+@lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """
+    Checks once whether the ffmpeg build lists the h264_nvenc encoder.
+    """
+    try:
+        result = subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", "-encoders"],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
+        return b"h264_nvenc" in result.stdout
+    except Exception:
+        return False
+
+def save_video(video_clip, output_path: str, fps: int = 24, hw: str = "auto", threads: int = None,
+               preset: str = "veryfast"):
     """
     Renders and saves the final video clip to the specified output path.
+    Encodes on an NVIDIA GPU through NVENC when available, otherwise with multi-threaded libx264.
+    The moov atom is moved to the front (+faststart) so the file can start playing before it
+    has fully downloaded.
     
     Parameters:
       video_clip: Composite video clip object.
       output_path (str): Destination file path for the final video.
       fps (int): Frames per second (default 24).
+      hw (str): "auto" uses NVENC if ffmpeg lists it, "nvenc" forces it, "none" always uses libx264.
+      threads (int): libx264 encoder threads (default: all cores but one, at least 2).
+      preset (str): libx264 preset, e.g. "veryfast", or "ultrafast" for drafts.
+      
+    Hyperparameters / Assumptions:
+      NVENC_PRESET = "p4"     # Balanced NVENC speed/quality preset.
+      NVENC_QUALITY = 23      # Constant-quality target for VBR rate control.
     """
-    video_clip.write_videofile(output_path, fps=fps)
\ No newline at end of file
+    if hw == "nvenc" or (hw == "auto" and _nvenc_available()):
+        try:
+            video_clip.write_videofile(
+                output_path, fps=fps, codec="h264_nvenc", preset="p4", audio_codec="aac", threads=2,
+                # moviepy only adds yuv420p for libx264; without it NVENC may emit 4:4:4 from rgb24
+                ffmpeg_params=["-b:v", "6M", "-rc", "vbr", "-cq", "23", "-pix_fmt", "yuv420p",
+                               "-movflags", "+faststart"]
+            )
+            return
+        except Exception as e:
+            # ffmpeg can list the encoder even when no usable GPU/driver is present
+            logging.warning(f"NVENC encode failed, falling back to libx264: {e}")
+    threads = threads or max(2, (os.cpu_count() or 1) - 1)
+    video_clip.write_videofile(
+        output_path, fps=fps, codec="libx264", preset=preset, threads=threads, audio_codec="aac",
+        ffmpeg_params=["-movflags", "+faststart"]
+    )
@@ -3,29 +3,92 @@ visual_processing.py
 
 This module handles visual content processing.
 It provides functions for selecting background clips based on thematic keywords
-and for creating text overlay clips using MoviePy.
+and for creating text overlay clips using MoviePy, with captions rendered by Pillow.
 """
 
 import os
 import logging
-from moviepy.editor import TextClip, ColorClip
+from concurrent.futures import ThreadPoolExecutor
+# Submodule imports instead of moviepy.editor, which loads every fx module and preview helper
+from moviepy.video.VideoClip import ImageClip, ColorClip
+from moviepy.video.compositing.transitions import crossfadein, crossfadeout
 from moviepy.video.tools.subtitles import SubtitlesClip
-import nltk
-import nltk.corpus
+from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+import numpy as np
 import re
 import random
-from typing import List, Dict, Tuple, Any
+import string
+from collections import Counter
+from itertools import accumulate
+from typing import List, Dict, Tuple, Any, Iterable, Iterator
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Download necessary NLTK data on first import
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
+# NLTK packages already located or downloaded in this process
+_NLTK_READY = set()
+
+def _ensure_nltk(resource: str, package: str) -> None:
+    """
+    Makes sure an NLTK data package is installed, downloading it if missing. NLTK is only
+    imported and probed the first time a code path actually needs the package.
+    """
+    if package in _NLTK_READY:
+        return
+    import nltk
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package, quiet=True)
+    _NLTK_READY.add(package)
+
+# Fallback when the NLTK stopword corpus is unavailable
+_FALLBACK_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at',
+    'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over',
+    'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how',
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just',
+    'don', 'should', 'now', 'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
+    'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers',
+    'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what',
+    'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing'
+})
+
+@lru_cache(maxsize=1)
+def _stopwords() -> frozenset:
+    """
+    Loads the English stopword list on first use, downloading the NLTK corpus if needed and
+    falling back to a built-in list if that fails. Shared by every extract_sentence_keywords call.
+    """
+    try:
+        _ensure_nltk('corpora/stopwords', 'stopwords')
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+    except Exception:
+        return _FALLBACK_STOPWORDS
+
+# Punctuation deleted before keyword extraction: ASCII plus the typographic quotes, dashes and
+# ellipsis that show up in fetched or AI-expanded facts
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation + '\u2018\u2019\u201c\u201d\u2013\u2014\u2026\u00ab\u00bb\u00bf\u00a1')
+
+# Sentence boundaries: whitespace after terminal punctuation
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Word tokens counted for duration estimates
+_WORD_RE = re.compile(r'\w+')
+
+# Short words never picked by highlight_key_words
+_COMMON_WORDS = frozenset({"the", "and", "a", "an", "in", "on", "at", "to", "for", "of", "with", "by", "as", "is", "are", "was", "were"})
+
+# Whitespace runs, kept as separators when splitting captions into words
+_WHITESPACE_RE = re.compile(r'(\s+)')
+
+# Words of four or more letters, the only ones highlight_key_words considers
+_CANDIDATE_RE = re.compile(r'\b[A-Za-z]{4,}\b')
 
 def select_background(keywords: list, config: dict) -> str:
     """
@@ -42,80 +105,210 @@ def select_background(keywords: list, config: dict) -> str:
     from video_assembly import download_background_clip
     return download_background_clip(keywords, config)
 
+def _caption_style(config: dict, box: tuple) -> dict:
+    """
+    Builds the render_caption keyword arguments from the config for a caption box covering
+    the given (width, height) fractions of the video resolution.
+    """
+    resolution = tuple(config.get("resolution", (1080, 1920)))
+    return dict(
+        font=config.get("font", "Impact"),
+        font_size=config.get("font_size", 90),
+        color=config.get("text_color", "white"),
+        stroke_color=config.get("text_outline_color", "black"),
+        stroke_width=config.get("text_outline_width", 5),
+        size=(int(resolution[0] * box[0]), int(resolution[1] * box[1])),
+        highlight_color=config.get("text_highlight_color", "#FFD700")
+    )
+
 def create_text_clip(text: str, config: dict):
     """
-    Creates a text overlay clip using MoviePy's TextClip with enhanced styling.
+    Creates a text overlay clip with enhanced styling. The caption is rendered with Pillow
+    (render_caption) instead of TextClip, so no ImageMagick process is started.
     
     Parameters:
         text (str): The text to display.
         config (dict): Configuration dictionary with styling parameters.
                        
     Returns:
-        TextClip: A MoviePy TextClip object with the specified styling and duration.
-    """
-    # Define styling settings
-    font = config.get("font", "Impact")  # Updated to Impact as default
-    font_size = config.get("font_size", 90)  # Increased font size
-    text_color = config.get("text_color", "white")
-    text_outline_color = config.get("text_outline_color", "black")
-    text_outline_width = config.get("text_outline_width", 5)
+        ImageClip: A MoviePy ImageClip of the caption with the specified styling and duration.
+    """
     video_duration = config.get("video_duration", 30)
     resolution = tuple(config.get("resolution", (1080, 1920)))
     
-    # Apply highlights to random words if enabled
+    # Pick random words to highlight if enabled
+    highlights = ()
     if config.get("highlight_enabled", True):
-        text = highlight_key_words(text, config.get("text_highlight_color", "#FFD700"))
-    
-    # Create the text clip with stroke (outline)
-    text_clip = TextClip(
-        txt=text,
-        fontsize=font_size,
-        font=font,
-        color=text_color,
-        stroke_color=text_outline_color,
-        stroke_width=text_outline_width,
-        method="caption",
-        size=(resolution[0] * 0.9, resolution[1] * 0.5)  # Increased width for better text fitting
-    )
+        text, highlights = highlight_key_words(text)
+    
+    # Render the caption with stroke (outline); wider box for better text fitting
+    text_clip = _caption_clip(text, tuple(highlights), _caption_style(config, (0.9, 0.5)))
     
     # Position at bottom third of the screen
-    bottom_third_position = ("center", resolution[1] * 0.7)
+    bottom_third_position = ("center", int(resolution[1] * 0.7))
     
     # Set the duration and position of the text overlay
     text_clip = text_clip.set_duration(video_duration).set_position(bottom_third_position)
     
     return text_clip
 
-def highlight_key_words(text: str, highlight_color: str) -> str:
+@lru_cache(maxsize=16)
+def _load_font(font: str, font_size: int):
+    """
+    Loads a TrueType font by name or path, trying "<font>.ttf" as well, and falls back to
+    Pillow's built-in font at the requested size (unsized before Pillow 10.1) if neither
+    can be found.
+    """
+    for candidate in (font, f"{font}.ttf"):
+        try:
+            return ImageFont.truetype(candidate, font_size)
+        except OSError:
+            continue
+    logging.warning(f"Font '{font}' not found, using Pillow's default font")
+    try:
+        return ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow < 10.1 has no sized default font, only the small bitmap one
+        return ImageFont.load_default()
+
+def _caption_paragraphs(text: str, color: str, highlights, highlight_color: str) -> List[List[List[Tuple[str, str]]]]:
     """
-    Randomly highlights 1-2 key nouns/verbs in the text with a different color.
+    Splits text into paragraphs (at newlines) of whitespace-separated words, each word a list
+    of (fragment, color) runs. Characters inside a highlight span get highlight_color; a span
+    may cover only part of a word, e.g. 'Know' in 'Know?'.
+    """
+    runs = []
+    pos = 0
+    for start, end in sorted(highlights):
+        runs.append((text[pos:start], color))
+        runs.append((text[start:end], highlight_color or color))
+        pos = end
+    runs.append((text[pos:], color))
+    
+    paragraphs, word = [[]], []
+    for run_text, run_color in runs:
+        for piece in _WHITESPACE_RE.split(run_text):
+            if not piece:
+                continue
+            if piece.isspace():
+                if word:
+                    paragraphs[-1].append(word)
+                    word = []
+                paragraphs.extend([] for _ in range(piece.count("\n")))
+            else:
+                word.append((piece, run_color))
+    if word:
+        paragraphs[-1].append(word)
+    return paragraphs
+
+def render_caption(text: str, font: str, font_size: int, color: str, stroke_color: str,
+                   stroke_width: int, size: tuple, highlights=(), highlight_color: str = None) -> np.ndarray:
+    """
+    Renders a caption bitmap in-process with Pillow, as a replacement for TextClip's
+    ImageMagick subprocess. Text is word-wrapped to the box width, each line is centered,
+    and the block is centered vertically. Highlight spans from highlight_key_words are
+    drawn directly in the highlight color, so no markup is generated or parsed.
     
     Parameters:
-        text (str): The text to process.
-        highlight_color (str): The color to use for highlighting.
+        text (str): Caption text.
+        font (str): Font name or path to a TrueType font file.
+        font_size (int): Font size in pixels.
+        color (str): Default text color.
+        stroke_color (str): Outline color.
+        stroke_width (int): Outline width in pixels.
+        size (tuple): (width, height) of the caption box.
+        highlights: (start, end) character spans of text to draw in highlight_color.
+        highlight_color (str): Color for the highlighted spans.
         
     Returns:
-        str: Text with HTML color tags for highlighted words.
+        np.ndarray: RGBA image of shape (height, width, 4), for ImageClip(..., transparent=True).
     """
-    # Split the text into words
-    words = text.split()
-    
-    # Filter out short words and common words
-    common_words = {"the", "and", "a", "an", "in", "on", "at", "to", "for", "of", "with", "by", "as", "is", "are", "was", "were"}
-    candidate_words = [i for i, word in enumerate(words) if len(word) > 3 and word.lower() not in common_words]
-    
-    # Choose 1-2 random words to highlight
-    num_to_highlight = min(len(candidate_words), random.randint(1, 2))
-    if num_to_highlight == 0:
-        return text
-    
-    indices_to_highlight = random.sample(candidate_words, num_to_highlight)
+    width, height = int(size[0]), int(size[1])
+    pil_font = _load_font(font, int(font_size))
+    space_width = pil_font.getlength(" ")
+    max_line_width = width - 2 * stroke_width
+    
+    # Greedy word wrap on rendered pixel widths; every paragraph starts a new line
+    lines = []
+    for paragraph in _caption_paragraphs(text, color, highlights, highlight_color):
+        line, line_width = [], 0.0
+        for word in paragraph:
+            runs = [(fragment, run_color, pil_font.getlength(fragment)) for fragment, run_color in word]
+            word_width = sum(run_width for _, _, run_width in runs)
+            new_width = word_width if not line else line_width + space_width + word_width
+            if line and new_width > max_line_width:
+                lines.append((line, line_width))
+                line, new_width = [], word_width
+            line.append((runs, word_width))
+            line_width = new_width
+        lines.append((line, line_width))
+    
+    ascent, descent = pil_font.getmetrics()
+    line_height = ascent + descent + stroke_width
+    y = (height - line_height * len(lines)) / 2
+    
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for line, line_width in lines:
+        x = (width - line_width) / 2
+        for runs, word_width in line:
+            run_x = x
+            for fragment, run_color, run_width in runs:
+                draw.text((run_x, y), fragment, font=pil_font, fill=run_color,
+                          stroke_width=stroke_width, stroke_fill=stroke_color)
+                run_x += run_width
+            x += word_width + space_width
+        y += line_height
+    
+    return np.asarray(image)
+
+def highlight_key_words(text: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Randomly picks 1-2 key nouns/verbs in the text to highlight with a different color.
+    The text is not marked up; render_caption draws the returned spans in the highlight color.
     
-    # Apply HTML color tags to the selected words
-    for idx in sorted(indices_to_highlight, reverse=True):
-        words[idx] = f'<font color="{highlight_color}">{words[idx]}</font>'
+    Parameters:
+        text (str): The text to process.
+        
+    Returns:
+        Tuple[str, List[Tuple[int, int]]]: The unchanged text and the (start, end) character
+                                           spans of the highlighted words, in text order.
+    """
+    # Candidate spans: the longer, non-common words, found in one regex pass
+    candidates = [match.span() for match in _CANDIDATE_RE.finditer(text)
+                  if match.group().lower() not in _COMMON_WORDS]
+    if not candidates:
+        return text, []
+    
+    # Choose 1-2 random words to highlight: one draw decides how many, then one draw per word
+    # (rejection sampling for a distinct second word), kept in text order
+    first = random.randrange(len(candidates))
+    if len(candidates) > 1 and random.random() < 0.5:
+        second = first
+        while second == first:
+            second = random.randrange(len(candidates))
+        chosen = [candidates[min(first, second)], candidates[max(first, second)]]
+    else:
+        chosen = [candidates[first]]
+    
+    return text, chosen
+
+def segment_highlights(segment: dict, highlight_enabled: bool) -> tuple:
+    """
+    Returns the highlight spans of a sentence segment: the 'highlights' chosen by
+    prepare_sentence_data, or, for segments from other sources (e.g. analyze_voiceover_timing),
+    freshly picked ones when highlighting is enabled.
     
-    return " ".join(words)
+    Parameters:
+        segment (dict): Segment with a 'text' key and optionally a 'highlights' key.
+        highlight_enabled (bool): Whether to pick highlights for segments that have none.
+        
+    Returns:
+        tuple: (start, end) character spans of the words to highlight.
+    """
+    if 'highlights' in segment:
+        return tuple(segment['highlights'])
+    return tuple(highlight_key_words(segment['text'])[1]) if highlight_enabled else ()
 
 def split_text_into_word_chunks(text: str, max_words_per_chunk: int = 5) -> List[str]:
     """
@@ -129,25 +322,25 @@ def split_text_into_word_chunks(text: str, max_words_per_chunk: int = 5) -> List
         List[str]: List of text chunks.
     """
     words = text.split()
-    chunks = []
-    
-    for i in range(0, len(words), max_words_per_chunk):
-        chunk = " ".join(words[i:i + max_words_per_chunk])
-        chunks.append(chunk)
-    
-    return chunks
+    return [" ".join(words[start:start + max_words_per_chunk]) for start in range(0, len(words), max_words_per_chunk)]
 
-def split_text_into_sentences(text: str) -> list:
+def split_text_into_sentences(text: str, use_nltk: bool = False) -> list:
     """
-    Splits the input text into sentences using NLTK.
+    Splits the input text into sentences at whitespace following ".", "!" or "?".
+    NLTK's Punkt tokenizer is slower but handles abbreviations such as "Dr." correctly.
     
     Parameters:
         text (str): The text to split into sentences.
+        use_nltk (bool): Use nltk.sent_tokenize instead of the regex splitter.
         
     Returns:
         list: List of sentences.
     """
-    return nltk.sent_tokenize(text)
+    if use_nltk:
+        _ensure_nltk('tokenizers/punkt', 'punkt')
+        import nltk
+        return nltk.sent_tokenize(text)
+    return [sentence for sentence in _SENTENCE_SPLIT_RE.split(text.strip()) if sentence]
 
 def extract_sentence_keywords(sentence: str, num_keywords: int = 3) -> list:
     """
@@ -160,55 +353,30 @@ def extract_sentence_keywords(sentence: str, num_keywords: int = 3) -> list:
     Returns:
         list: List of extracted keywords.
     """
-    # Try to download stopwords if not already available
-    try:
-        from nltk.corpus import stopwords
-        stop_words = set(stopwords.words('english'))
-    except:
-        try:
-            nltk.download('stopwords', quiet=True)
-            from nltk.corpus import stopwords
-            stop_words = set(stopwords.words('english'))
-        except:
-            # Fallback to a simple list of common stopwords
-            stop_words = {'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until',
-                         'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between',
-                         'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to',
-                         'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again',
-                         'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how',
-                         'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such',
-                         'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
-                         's', 't', 'can', 'will', 'just', 'don', 'should', 'now', 'i', 'me', 'my',
-                         'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours',
-                         'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her',
-                         'hers', 'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs',
-                         'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', 'these',
-                         'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have',
-                         'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the',
-                         'and', 'but', 'if', 'or', 'because', 'as', 'until', 'while'}
-    
+    # Results are cached as tuples; hand each caller its own list
+    return list(_sentence_keywords(sentence, num_keywords))
+
+@lru_cache(maxsize=4096)
+def _sentence_keywords(sentence: str, num_keywords: int) -> tuple:
+    """
+    Cached implementation of extract_sentence_keywords.
+    """
     # Remove punctuation and convert to lowercase
-    clean_sentence = re.sub(r'[^\w\s]', '', sentence.lower())
+    clean_sentence = sentence.lower().translate(_PUNCT_TABLE)
     
     # Split into words and remove stopwords
     words = clean_sentence.split()
+    stop_words = _stopwords()
     filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
     
     # Return the most frequent/important words
     # This is a simple approach; more sophisticated NLP techniques could be used
-    word_freq = {}
-    for word in filtered_words:
-        if word in word_freq:
-            word_freq[word] += 1
-        else:
-            word_freq[word] = 1
-    
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    keywords = [word for word, freq in sorted_words[:num_keywords]]
+    keywords = tuple(word for word, _ in Counter(filtered_words).most_common(num_keywords))
     
     # If we don't have enough keywords, return what we have
-    return keywords if keywords else ["nature"]  # Default fallback
+    return keywords if keywords else ("nature",)  # Default fallback
 
+@lru_cache(maxsize=4096)
 def estimate_sentence_duration(sentence: str, words_per_second: float = 2.5) -> float:
     """
     Estimates the duration needed to speak a sentence based on word count.
@@ -221,27 +389,28 @@ def estimate_sentence_duration(sentence: str, words_per_second: float = 2.5) ->
         float: Estimated duration in seconds.
     """
     # Split the sentence into words and count them
-    words = re.findall(r'\w+', sentence)
-    word_count = len(words)
+    word_count = len(_WORD_RE.findall(sentence))
     
     # Calculate duration with a minimum of 2 seconds
     duration = max(word_count / words_per_second, 2.0)
     
     return duration
 
-def prepare_sentence_data(fact_text: str, config: dict) -> list:
+def prepare_sentence_data(fact_text: str, config: dict) -> Iterator[dict]:
     """
-    Prepares data for each sentence including text, keywords, and estimated duration.
+    Prepares data for each sentence including text, keywords, estimated duration and, if
+    highlighting is enabled, the spans of the chunk's highlighted words. Chunks are yielded
+    one at a time; wrap the call in list() where the data is needed more than once.
     
     Parameters:
         fact_text (str): The full fact text to be processed.
         config (dict): Configuration dictionary.
         
     Returns:
-        list: List of dictionaries with data for each sentence.
+        Iterator[dict]: Dictionaries with data for each sentence chunk.
     """
-    sentences = split_text_into_sentences(fact_text)
-    sentence_data = []
+    sentences = split_text_into_sentences(fact_text, config.get("use_nltk_sentences", False))
+    highlight_enabled = config.get("highlight_enabled", True)
     
     for sentence in sentences:
         keywords = extract_sentence_keywords(sentence)
@@ -258,68 +427,70 @@ def prepare_sentence_data(fact_text: str, config: dict) -> list:
         
         # Create data for each chunk
         for chunk in chunks:
-            sentence_data.append({
+            # Pick the highlighted words once here, so every consumer draws the same ones
+            yield {
                 'text': chunk,
                 'keywords': keywords,
-                'duration': chunk_duration
-            })
-    
-    return sentence_data
+                'duration': chunk_duration,
+                'highlights': tuple(highlight_key_words(chunk)[1]) if highlight_enabled else ()
+            }
+
+def _caption_clip(text: str, highlights: tuple, style: dict):
+    """
+    Returns an ImageClip of text rendered by render_caption with the given highlight spans and style.
+    """
+    return ImageClip(render_caption(text, highlights=highlights, **style), transparent=True)
 
-def create_dynamic_text_clips(sentence_data: list, config: dict) -> list:
+def create_dynamic_text_clips(sentence_data: Iterable[dict], config: dict) -> list:
     """
     Creates text clips for each sentence chunk with transitions.
     
     Parameters:
-        sentence_data (list): List of dictionaries with sentence data.
+        sentence_data (Iterable[dict]): Dictionaries with sentence data, e.g. from prepare_sentence_data.
+                                        Highlights are taken from each segment's 'highlights',
+                                        or picked here if it has none and highlighting is enabled.
         config (dict): Configuration dictionary.
         
     Returns:
-        list: List of TextClip objects.
+        list: List of ImageClip caption clips.
     """
     resolution = tuple(config.get("resolution", (1080, 1920)))
-    font = config.get("font", "Impact")
-    font_size = config.get("font_size", 90)
-    text_color = config.get("text_color", "white")
-    text_outline_color = config.get("text_outline_color", "black")
-    text_outline_width = config.get("text_outline_width", 5)
-    highlight_color = config.get("text_highlight_color", "#FFD700")
+    highlight_enabled = config.get("highlight_enabled", True)
     
-    text_clips = []
-    current_time = 0
+    # Styling is identical for every segment, so build the render_caption arguments once
+    style = _caption_style(config, (0.9, 0.5))
+    # Position at bottom third of the screen
+    bottom_third_position = ("center", int(resolution[1] * 0.7))
     
+    # Read the segments in a single pass (sentence_data may be a generator); highlights are
+    # usually already chosen by prepare_sentence_data
+    captions, durations = [], []
     for segment in sentence_data:
-        text = segment['text']
-        duration = segment['duration']
-        
-        # Apply highlighting to random words
-        if config.get("highlight_enabled", True):
-            text = highlight_key_words(text, highlight_color)
-        
-        # Create text clip with outline
-        text_clip = TextClip(
-            txt=text,
-            fontsize=font_size,
-            font=font,
-            color=text_color,
-            stroke_color=text_outline_color,
-            stroke_width=text_outline_width,
-            method="caption",
-            size=(resolution[0] * 0.9, resolution[1] * 0.5)
-        )
-        
-        # Position at bottom third of the screen
-        bottom_third_position = ("center", resolution[1] * 0.7)
-        
-        # Set position, timing, and add fade effects
-        text_clip = (text_clip
+        captions.append((segment['text'], segment_highlights(segment, highlight_enabled)))
+        durations.append(segment['duration'])
+    
+    # Render each distinct caption of this call once; the renders are independent, so they
+    # overlap on threads. Repeats share a render, and each use below gets its own copy.
+    unique_captions = list(dict.fromkeys(captions))
+    rendered = {}
+    if unique_captions:
+        with ThreadPoolExecutor(max_workers=min(len(unique_captions), os.cpu_count() or 1)) as executor:
+            rendered = dict(zip(unique_captions, executor.map(
+                lambda caption: _caption_clip(caption[0], caption[1], style), unique_captions)))
+    
+    # Lay out the timeline up front: each segment starts where the previous ones end
+    starts = [0, *accumulate(durations)]
+    
+    text_clips = []
+    
+    for caption, start, duration in zip(captions, starts, durations):
+        # Set position, timing, and add fade effects (each set_* returns a new clip)
+        text_clip = (rendered[caption]
                     .set_position(bottom_third_position)
-                    .set_start(current_time)
-                    .set_duration(duration)
-                    .crossfadein(0.3)
-                    .crossfadeout(0.3))
+                    .set_start(start)
+                    .set_duration(duration))
+        text_clip = crossfadeout(crossfadein(text_clip, 0.3), 0.3)
         
         text_clips.append(text_clip)
-        current_time += duration
     
-    return text_clips
\ No newline at end of file
+    return text_clips
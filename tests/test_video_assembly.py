@@ -0,0 +1,38 @@
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+
+import video_assembly
+
+
+@pytest.mark.filterwarnings("error")
+def test_loop_audio_is_exact_across_loop_points(tmp_path):
+    # Longer than the reader's 200000-frame buffer, so a chunk crossing the loop point
+    # cannot be served from a single buffered window
+    sample_rate = 44100
+    frame_count = int(8.4 * sample_rate)
+    samples = (np.random.default_rng(0).uniform(-0.5, 0.5, (frame_count, 2)) * 32767).astype(np.int16)
+    path = str(tmp_path / "music.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+    music = AudioFileClip(path)
+    looped = video_assembly._loop_audio(music, 20)
+    try:
+        # One chunk inside the first pass, and one straddling each of the two loop points
+        for chunk_start in (1.0, 8.39, 16.79):
+            t = np.arange(int(chunk_start * sample_rate), int(chunk_start * sample_rate) + 2000) / sample_rate
+            expected = samples[np.round(t * sample_rate).astype(int) % frame_count] / 32768
+            np.testing.assert_array_equal(looped.get_frame(t), expected)
+    finally:
+        music.close()